@@ -3,45 +3,98 @@
 A utility to download podcasts
 '''
 
-# TODO: Move the namespace search REGEX string from the config into the script
-        # This does not need to be managed by the end user unless they are
-        # an advanced user.
 # TODO: Add Docstrings and ensure comments are accurate and helpful
 # TODO: Syslogging and/or debug messaging
 # TODO: Remove print statements
-# TODO: Multithreaded downloads
 # TODO: Error handling
 # TODO: Add type hints to functions
 
+import functools
+import hashlib
+import io
+import json
 import os
+import pathlib
 import sys
+import threading
 import re
-import time  # TODO: Remove if not needed for dry run workflow? (Sleep)
 import xml.etree.ElementTree as ET
-from datetime import datetime
+from concurrent.futures import CancelledError, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 
 import mimetypes
-import mutagen
+import mutagen.id3
+import mutagen.mp3
 import requests
+from requests.adapters import HTTPAdapter
 import yaml
 
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
 
 # Set up configuration for the run
 script_location = os.path.dirname(os.path.realpath(sys.argv[0]))
 with open(f"{script_location}/config.yaml", "r", encoding='utf-8') as cfg:
     config = cfg.read()
 
-config = yaml.safe_load(config)
+config = yaml.load(config, Loader=YamlLoader)
+
+# Expand out path once, all output paths are built from this root
+OUT_ROOT = pathlib.Path(
+    os.path.expandvars(os.path.expanduser(config['outPath']))
+).resolve()
+
+# Number of episodes downloaded at the same time, across all podcasts
+MAX_DOWNLOADS = config.get('maxDownloads', 8)
+
+# Episodes share a handful of MIME types, remember their extensions
+guess_extension = functools.lru_cache(maxsize=128)(mimetypes.guess_extension)
+
+# Episodes from every podcast share one pool so total downloads stay bounded
+EPISODE_POOL = ThreadPoolExecutor(max_workers=MAX_DOWNLOADS)
+
+# Episode art is fetched on its own pool, alongside the episode download
+ART_POOL = ThreadPoolExecutor(max_workers=MAX_DOWNLOADS)
+
+# Cached RSS feeds, used for conditional requests (ETag / Last-Modified)
+RSS_CACHE_DIR = OUT_ROOT / '.rss_cache'
+RSS_CACHE_INDEX = RSS_CACHE_DIR / 'index.json'
+RSS_CACHE_LOCK = threading.Lock()
 
-# Expand out path and append a '/' if not present
-config['outPath'] = os.path.expandvars(config["outPath"])
-config['outPath'] = os.path.expanduser(config["outPath"])
-if config['outPath'][:-1] != '/':
-    config['outPath'] += '/'
+# Serialises console output from the download threads
+LOG_LOCK = threading.Lock()
 
+# Shared HTTP session so connections to the same host are reused, sized for
+# an episode and its art downloading at once on every episode worker
+SESSION = requests.Session()
+SESSION.mount('https://', HTTPAdapter(pool_connections=16,
+                                      pool_maxsize=max(32, 2 * MAX_DOWNLOADS),
+                                      max_retries=3))
+SESSION.mount('http://', HTTPAdapter(pool_connections=16,
+                                     pool_maxsize=max(32, 2 * MAX_DOWNLOADS),
+                                     max_retries=3))
 
 
-def extract_date(episode_obj: ET.Element) -> datetime.strptime :
+def log(message: str) -> None:
+    """
+    Prints a message in a single write so lines from different threads do \
+    not interleave.
+
+    Parameters
+    ----------
+
+    **message**: str -- The message to print, may span several lines.
+    """
+    with LOG_LOCK:
+        sys.stdout.write(f'{message}\n')
+        sys.stdout.flush()
+
+
+def extract_date(episode_obj: ET.Element) -> datetime:
     """
     Extracts the episode publication date from the episode xml.
 
@@ -54,15 +107,85 @@ def extract_date(episode_obj: ET.Element) -> datetime.strptime :
     Returns
     -------
     
-     **_**: str -- A string representation of the episode publication date.  
-    ex. 'Mon, 01 Jan 2000 10:45:21 -0600z'
+     **_**: datetime -- The parsed RFC 2822 episode publication date.  
+    ex. 'Mon, 01 Jan 2000 10:45:21 -0600'
+    """
+    date = parsedate_to_datetime(episode_obj.find("pubDate").text)
+    # Dates with a '-0000' offset parse as naive, keep them sortable
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return date
+
+
+def load_rss_index() -> dict:
+    """
+    Loads the RSS cache index. Callers should hold RSS_CACHE_LOCK.
+
+    Returns
+    -------
+
+    **_**: dict -- (etag, last_modified, local_path) keyed by feed URL.
+    """
+    try:
+        with open(RSS_CACHE_INDEX, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def get_cached_rss(url: str) -> bytes:
     """
-    date_str = episode_obj.find("pubDate").text
-    date_format = "%a, %d %b %Y %H:%M:%S %z"
-    return datetime.strptime( date_str, date_format )
+    Downloads an RSS feed, using the locally cached copy when the server \
+    reports it has not changed since the last run.
 
+    Parameters
+    ----------
 
-def get_rss(xml_location: str) -> str:
+    **url**: str -- The URL of the RSS feed.
+
+    Returns
+    -------
+
+    **_**: bytes -- The complete RSS feed xml document.
+    """
+    with RSS_CACHE_LOCK:
+        index = load_rss_index()
+
+    etag, last_modified, local_path = index.get(url, (None, None, None))
+
+    headers = {}
+    if local_path and os.path.exists(local_path):
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+    r = SESSION.get(url, headers=headers, timeout=120)
+    if r.status_code == 304:
+        log(f'RSS feed not modified, using cached copy of {url}')
+        with open(local_path, 'rb') as f:
+            return f.read()
+
+    # Only cache a successful response, never an error page
+    r.raise_for_status()
+
+    # Save the feed and its validators for the next run
+    local_path = str(RSS_CACHE_DIR / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.xml")
+    RSS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with open(local_path, 'wb') as f:
+        f.write(r.content)
+
+    # Feeds are fetched concurrently, reload the index before updating it
+    with RSS_CACHE_LOCK:
+        index = load_rss_index()
+        index[url] = (r.headers.get('ETag'), r.headers.get('Last-Modified'), local_path)
+        with open(RSS_CACHE_INDEX, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2)
+
+    return r.content
+
+
+def get_rss(xml_location: str) -> bytes:
     """
     Loads the RSS from an online source or local file if present.
 
@@ -74,18 +197,84 @@ def get_rss(xml_location: str) -> str:
     Returns
     -------
     
-    - **xml**: str -- A string containing the complete RSS feed xml document \
-        location. This can be a URL or local file path.
+    - **xml**: bytes -- The complete RSS feed xml document.
     """
-    if xml_location[0:4] == 'http':
-        xml = requests.get(xml_location, timeout=120).content
+    if xml_location.startswith(('http://', 'https://')):
+        xml = get_cached_rss(xml_location)
     else:
-        with open(xml_location, encoding='utf-8') as xml_text:
+        with open(xml_location, 'rb') as xml_text:
             xml = xml_text.read()
-    # Get name spaces
-    ns = { x[0]: x[1] for x in re.findall(config['namespaceRegex'], xml.decode("UTF-8")) }
 
-    return xml, ns
+    return xml
+
+
+def parse_rss(rss_xml: bytes) -> tuple:
+    """
+    Parses the RSS feed in a single streaming pass, collecting the channel \
+    details and the episode items.
+
+    Parameters
+    ----------
+
+    **rss_xml**: bytes -- The complete RSS feed xml document.
+
+    Returns
+    -------
+
+    **channel**: dict -- The channel 'title', 'copyright', 'author' and \
+        'image' (url) text.
+    **items**: list -- The episode XML elements, stripped down to the tags \
+        used when processing an episode.
+    **image_tag**: str -- The fully qualified itunes:image tag, or None \
+        when the feed does not declare the itunes name space.
+    """
+    author_tag = None
+    image_tag = None
+    episode_tags = {'title', 'description', 'pubDate', 'enclosure'}
+    channel_paths = {
+        ('channel', 'title'): 'title',
+        ('channel', 'copyright'): 'copyright',
+        ('channel', 'image', 'url'): 'image',
+    }
+
+    channel = {'title': None, 'copyright': None, 'author': None, 'image': None}
+    items = []
+    path = []
+    parents = []
+
+    events = ('start-ns', 'start', 'end')
+    for event, elem in ET.iterparse(io.BytesIO(rss_xml), events=events):
+        if event == 'start-ns':
+            prefix, uri = elem
+            if prefix == 'itunes':
+                author_tag = f'{{{uri}}}author'
+                image_tag = f'{{{uri}}}image'
+                episode_tags.add(image_tag)
+            continue
+
+        if event == 'start':
+            path.append(elem.tag)
+            parents.append(elem)
+            continue
+
+        path.pop()
+        parents.pop()
+        key = tuple(path[1:]) + (elem.tag,)
+
+        if key in channel_paths:
+            channel[channel_paths[key]] = elem.text or ''
+        elif elem.tag == author_tag and channel['author'] is None:
+            channel['author'] = elem.text or ''
+        elif key == ('channel', 'item'):
+            # Drop unused children (show notes, etc.) and detach the item
+            # from the channel so the tree does not grow with the feed
+            for child in list(elem):
+                if child.tag not in episode_tags:
+                    elem.remove(child)
+            parents[-1].remove(elem)
+            items.append(elem)
+
+    return channel, items, image_tag
 
 
 def out_date(date_object) -> datetime.strftime:
@@ -105,22 +294,43 @@ def out_date(date_object) -> datetime.strftime:
     return datetime.strftime( date_object, '%Y-%m-%d')
 
 
-def date_sort(episode_list: ET.Element) -> ET.Element:
+def date_sort(episode_list: list) -> list:
     """
     Sorts all episodes from oldest to newest.
     
     Parameters
     ----------
 
-    **episode_list**: ET.Element -- An XML element containing the list of all RSS \
-        episodes
+    **episode_list**: list -- The XML elements for all RSS episodes
 
     Returns
     -------
 
-    **_**: ET.Element -- List of episodes in order by date
+    **_**: list -- (date, episode) pairs in order by date. Each publication \
+        date is only parsed once.
+    """
+    decorated = [(extract_date(episode), episode) for episode in episode_list]
+    decorated.sort(key=lambda pair: pair[0])
+    return decorated
+
+
+_UPPER_CHARACTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZÀÈÌÒÙÁÉÍÓÚÝÂÊÎÔÛÄËÏÖÜŸÃÑÕÅÆŒÇÐØ"
+GOOD_CHARACTERS = frozenset(_UPPER_CHARACTERS
+                            + _UPPER_CHARACTERS.lower()
+                            + "1234567890-_.ß")
+
+
+class _FilenameTable(dict):
+    """
+    Translation table for str.translate that drops any character not in \
+    GOOD_CHARACTERS. Entries are filled in the first time a character is seen.
     """
-    return sorted(episode_list, key=extract_date )
+    def __missing__(self, codepoint: int):
+        self[codepoint] = codepoint if chr(codepoint) in GOOD_CHARACTERS else None
+        return self[codepoint]
+
+
+_FILENAME_TABLE = _FilenameTable()
 
 
 def clean_filename(file_str: str) -> str:
@@ -137,19 +347,46 @@ def clean_filename(file_str: str) -> str:
     
     str -- The sanitized filename.
     """
-    good_character = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
-    good_character += "ÀÈÌÒÙÁÉÍÓÚÝÂÊÎÔÛÄËÏÖÜŸÃÑÕÅÆŒÇÐØ"
-    good_character += good_character.lower()
-    good_character += "1234567890-_.ß"
-
     # Modify spaces and ":" characters to filename friendly characters
     file_str = re.sub(r"\s+", '_', file_str)
 
-    # String Comprehension! Filter out any other "bad" characters
-    return ''.join(lett if lett in good_character else '' for lett in file_str)
+    # Filter out any other "bad" characters
+    return file_str.translate(_FILENAME_TABLE)
 
 
-def process_podcast(episode_number: int, episode: ET.Element, podcast_config: dict) -> None:
+def episode_details(episode: ET.Element, image_tag: str) -> dict:
+    """
+    Collects the episode fields in a single pass over the episode children.
+
+    Parameters
+    ----------
+
+    **episode**: ET.Element -- An XML element holding the information for a \
+        single podcast episode.
+    **image_tag**: str -- The fully qualified itunes:image tag, \
+        ex. '{http://www.itunes.com/dtds/podcast-1.0.dtd}image'
+
+    Returns
+    -------
+
+    **details**: dict -- The child text keyed by tag name, plus the \
+        enclosure 'url' and 'type' and the episode art 'image' url.
+    """
+    details = {}
+    for child in episode:
+        if child.tag in details:
+            continue
+        if child.tag == 'enclosure':
+            details.setdefault('url', child.get('url'))
+            details.setdefault('type', child.get('type'))
+        elif child.tag == image_tag:
+            details.setdefault('image', child.get('href'))
+        details[child.tag] = child.text or ''
+    return details
+
+
+def process_podcast(episode_number: int, episode_date: datetime, episode: ET.Element,
+                    podcast_config: dict, existing: set) -> None:
     """
     "Main" function to load RSS feed and download episodes
 
@@ -157,166 +394,262 @@ def process_podcast(episode_number: int, episode: ET.Element, podcast_config: di
     ----------
 
     **episode_number**: int -- A number representing the episode release order
+    **episode_date**: datetime -- The parsed episode publication date.
     **episode**: ET.Element -- An XML element holding the information for a \
         single podcast episode.
-    **tags**: dict -- any extra tags for the episode. (Default: {})
+    **podcast_config**: dict -- The podcast settings and podcast level tags.
+    **existing**: set -- File names already present in the podcast directory.
     """
     # Notes:
     # ID3 Tag List
     # https://exiftool.org/TagNames/ID3.html
 
-    tags = podcast_config['podcast_tags']
+    # Copy the podcast level tags, episodes are processed concurrently
+    tags = {**podcast_config['podcast_tags']}
 
-    tags['title']            = episode.findtext('title')
-    tags['description']      = episode.findtext('description')
-    tags['PublicationDate']  = episode.findtext('pubDate')
-    tags['date']             = extract_date(episode)
-    tags['rawURL']           = episode.find('enclosure').get('url')
-    tags['genre']            = 'Podcast'
-    tags['extension']        = mimetypes.guess_extension(
-                                    episode.find('enclosure').get('type')
-                                )
-    print(f'Working on {tags["title"]}')
+    details = episode_details(episode, podcast_config['_itunesImageTag'])
+
+    tags['title']            = details.get('title')
+    tags['date']             = episode_date
+    tags['extension']        = guess_extension(details['type'])
+    prefix = f'[{podcast_config["name"]}]'
+    log(f'{prefix} Working on {tags["title"]}')
 
     # Prepare date for filename
     date_string = out_date(tags['date'])
-    tags['dateYear'] = str(tags['date'].year)
 
     # Build Filename
     filename = clean_filename(f"{date_string}_ep{episode_number}_"
                               f"{tags['title']}{tags['extension']}"
                             )
-    full_path = f'{podcast_config["outDir"]}{filename}'
+    full_path = podcast_config['outDir'] / filename
+
+    # Skip before doing any more work if the episode is already downloaded
+    if filename in existing:
+        log(f'{prefix} Episode already downloaded. Skipping...\n'
+            f'{prefix}\t    Track: {episode_number}\n'
+            f'{prefix}\tFile name: {filename}')
+        return
+
+    if config['dryRun']:
+        log(f'{prefix} Executing dry run, skipping download of {filename}')
+        return
+
+    tags['description']      = details.get('description')
+    tags['PublicationDate']  = details.get('pubDate')
+    tags['rawURL']           = details['url']
+    tags['genre']            = 'Podcast'
+    tags['dateYear']         = str(tags['date'].year)
 
     # Get Download URL
-    try:
-        match_string = re.compile(podcast_config['episodeUrlFilter'])
-        processed_url = match_string.findall(tags['rawURL'])[0]
-    except KeyError:
+    if podcast_config['_episodeUrlRe']:
+        processed_url = podcast_config['_episodeUrlRe'].findall(tags['rawURL'])[0]
+    else:
         processed_url = tags['rawURL']
 
-    if not os.path.exists(full_path) and not config['dryRun']:
-        # Download episode art if present
-        try:
-            episode_art_url = episode.find('.//itunes:image',
-                                        namespaces=podcast_config['namespaces']
-                                        ).get('href')
-        except AttributeError:
-            print('No Episode Art Found!')
-            episode_art_url = None
+    # Start the episode art download while the episode downloads
+    episode_art_url = details.get('image')
+    if episode_art_url:
+        if podcast_config['_artUrlRe']:
+            processed_art_url = podcast_config['_artUrlRe'].findall(episode_art_url)[0]
+        else:
+            processed_art_url = episode_art_url
+        art_future = ART_POOL.submit(SESSION.get, processed_art_url, timeout=30)
+    else:
+        log(f'{prefix} No Episode Art Found for {filename}!')
+
+    # Download Episode and stream it to a partial file, it is only given the
+    # episode file name once it is complete and tagged
+    part_path = full_path.with_name(f'{filename}.part')
+    log(f'{prefix} Downloading {filename}')
+    try:
+        with SESSION.get(processed_url, timeout=30, stream=True) as html:
+            html.raise_for_status()
+            with open(part_path, 'wb') as f:
+                for chunk in html.iter_content(chunk_size=1 << 16):
+                    f.write(chunk)
 
         if episode_art_url:
             try:
-                match_string = re.compile(podcast_config['artUrlFilter'])
-                processed_art_url = match_string.findall(episode_art_url)[0]
-            except KeyError:
-                processed_art_url = episode_art_url
-            eart = requests.get(processed_art_url, timeout=30)
+                eart = art_future.result()
+                eart.raise_for_status()
+            except requests.RequestException as err:
+                log(f'{prefix} Episode art download failed for {filename}, '
+                    f'using podcast art. ({err})')
+                episode_art_url = None
+
+        if episode_art_url:
             tags['episode_art']      = eart.content
             tags['episode_art_mime'] = eart.headers['Content-Type']
         else:
             tags['episode_art']      = tags['art']
             tags['episode_art_mime'] = tags['artMime']
 
-        tags['episode_art_ext']  = mimetypes.guess_extension(
+        tags['episode_art_ext']  = guess_extension(
                                         tags['episode_art_mime'])
 
-        # Download Episode
-        print(f'Downloading {filename}')
-        html = requests.get(processed_url, timeout=30)
+        # Update Metadata, keeping any existing tags (chapters, comments, etc.)
+        # and writing them once. Loading the file also fails on non MP3 data.
+        tag_file = mutagen.mp3.MP3(part_path)
+        if tag_file.tags is None:
+            tag_file.add_tags()
+
+        tag_file.tags.add(mutagen.id3.TRCK(encoding=3, text=str(episode_number)))
+        tag_file.tags.add(mutagen.id3.TIT2(encoding=3, text=tags["title"]))
+        tag_file.tags.add(mutagen.id3.TALB(encoding=3, text=tags["album"]))
+        tag_file.tags.add(mutagen.id3.TCOP(encoding=3, text=tags["copyright"]))
+        tag_file.tags.add(mutagen.id3.TPE1(encoding=3, text=tags["artist"]))
+        tag_file.tags.add(mutagen.id3.TPE2(encoding=3, text=tags["album_artist"]))
+        tag_file.tags.add(mutagen.id3.TCON(encoding=3, text=tags["genre"]))
+        tag_file.tags.add(mutagen.id3.TDRC(encoding=3, text=tags["dateYear"]))
 
-        # Save Episode to file
-        print(f'Saving {filename}')
-        with open(full_path, 'wb') as f:
-            f.write(html.content)
-
-        # Update Metadata
-        tag_file = mutagen.File(full_path)
+        if episode_art_url:
+            tag_file.tags.add(mutagen.id3.APIC(
+                data=tags["episode_art"],
+                type=mutagen.id3.PictureType.COVER_FRONT,
+                # desc="cover",
+                mime=tags["episode_art_mime"]))
+        else:
+            tag_file.tags.add(podcast_config['_coverApic'])
 
-        # print('\nInitial Tags')
+        # print('\nFinal Tags')
         # for tag in tag_file.tags.items():
         #     if tag[0][:-1] == 'APIC':
         #         print(tag[0])
         #     else:
         #         print(tag)
 
-        tag_file['TRCK'] = mutagen.id3.TRCK(encoding=3, text=str(episode_number))
-        tag_file['TIT2'] = mutagen.id3.TIT2(encoding=3, text=tags["title"])
-        tag_file['TALB'] = mutagen.id3.TALB(encoding=3, text=tags["album"])
-        tag_file['TCOP'] = mutagen.id3.TCOP(encoding=3, text=tags["copyright"])
-        tag_file['TPE1'] = mutagen.id3.TPE1(encoding=3, text=tags["artist"])
-        tag_file['TPE2'] = mutagen.id3.TPE2(encoding=3, text=tags["album_artist"])
-        tag_file['TCON'] = mutagen.id3.TCON(encoding=3, text=tags["genre"])
-        tag_file['TDRC'] = mutagen.id3.TDRC(encoding=3, text=tags["dateYear"])
-
-        tag_file['APIC:'] = mutagen.id3.APIC(
-            data=tags["episode_art"],
-            type=mutagen.id3.PictureType.COVER_FRONT,
-            # desc="cover",
-            mime=tags["episode_art_mime"])
+        tag_file.save(v2_version=4)
+    except BaseException:
+        # Do not leave a partial or untagged download behind
+        part_path.unlink(missing_ok=True)
+        raise
 
-        # print('\nFinal Tags')
-        # for tag in tag_file.tags.items():
-        #     if tag[0][:-1] == 'APIC':
-        #         print(tag[0])
-        #     else:
-        #         print(tag)
+    os.replace(part_path, full_path)
+    log(f'{prefix} Saved {filename}')
 
-        tag_file.save()
 
-    elif config['dryRun']:
-        print('Executing dry run, sleeping 0.1 second.')
-        time.sleep(0.1)
+def process_feed(podcast_number: int, podcast: dict) -> None:
+    """
+    Loads a single podcast feed and downloads its episodes.
 
-    else:
-        print('Episode already downloaded. Skipping...')
-        print(f'\t    Track: {episode_number}')
-        print(f'\tFile name: {filename}')
+    Parameters
+    ----------
+
+    **podcast_number**: int -- The position of the podcast in the config.
+    **podcast**: dict -- The podcast settings from the config 'podList'.
+    """
+    log(f'[{podcast["name"]}] Starting podcast {podcast_number}')
+
+    podcast_config = {}
+    podcast_config.update(podcast)
+    podcast_config['outDir'] = OUT_ROOT / podcast_config['name']
+
+    # Compile the optional URL filters once per podcast
+    podcast_config['_episodeUrlRe'] = (
+        re.compile(podcast_config['episodeUrlFilter'])
+        if 'episodeUrlFilter' in podcast_config else None
+    )
+    podcast_config['_artUrlRe'] = (
+        re.compile(podcast_config['artUrlFilter'])
+        if 'artUrlFilter' in podcast_config else None
+    )
+
+    podcast_config['outDir'].mkdir(parents=True, exist_ok=True)
+
+    # Index the downloaded episodes with a single directory read
+    existing = {entry.name for entry in os.scandir(podcast_config['outDir'])}
+
+    rss_xml = get_rss(podcast_config['rssFeedUrl'])
+    channel, items, image_tag = parse_rss(rss_xml)
+
+    r = SESSION.get(
+                    url=channel['image'],
+                    timeout=10
+                )
+
+    podcast_config['episodes'] = date_sort(items)
+    podcast_config['_itunesImageTag'] = image_tag
+    # Feeds may leave out these fields (ex. no itunes name space for the
+    # author), default them so the ID3 text frames can still be written
+    podcast_config['podcast_tags'] = {
+        'album': channel['title'] or '',
+        'art': r.content,
+        'artMime': r.headers['Content-Type'],
+        'artist': channel['author'] or '',
+        'album_artist': channel['title'] or '',
+        'copyright': channel['copyright'] or '',
+    }
+
+    # Podcast art frame shared by episodes without their own art
+    podcast_config['_coverApic'] = mutagen.id3.APIC(
+        data=podcast_config['podcast_tags']['art'],
+        type=mutagen.id3.PictureType.COVER_FRONT,
+        mime=podcast_config['podcast_tags']['artMime'])
+
+    ext = guess_extension(podcast_config['podcast_tags']['artMime'])
+    out_path = podcast_config['outDir'] / f'cover{ext}'
+
+    # Save a copy of the album art
+    with open(out_path, 'wb') as f:
+        f.write(podcast_config['podcast_tags']['art'])
+
+    # Download episodes on the shared pool, bounded by MAX_DOWNLOADS overall
+    futures = {
+        EPISODE_POOL.submit(process_podcast, i, date, episode, podcast_config, existing):
+            episode.findtext('title')
+        for i, (date, episode) in enumerate(podcast_config['episodes'], start=1)
+    }
+
+    # Report every failed episode, not just the first. Future.exception() is
+    # used over wait() as it also returns for episodes cancelled on shutdown.
+    failed = 0
+    for future, title in futures.items():
+        try:
+            err = future.exception()
+        except CancelledError:
+            continue
+        if err is None:
+            continue
+        log(f'[{podcast_config["name"]}] Episode "{title}" failed: '
+            f'{type(err).__name__}: {err}')
+        failed += 1
+
+    if failed:
+        raise RuntimeError(f'{failed} episode(s) failed')
 
 
 def main() -> None:
     """
     Main setup function for rest of the application.
     """
-    for i, podcast in enumerate(config['podList']):
-        print(f'Starting podcast {i+1}, "{podcast["name"]}"')
-
-        podcast_config = {}
-        podcast_config.update(podcast)
-        podcast_config['outDir'] = f"{config['outPath']}{podcast_config['name']}/"
-
-        if not os.path.isdir(podcast_config['outDir']):
-            os.makedirs(podcast_config['outDir'], exist_ok = True)
-
-        rss_xml, ns = get_rss(podcast_config['rssFeedUrl'])
-        root = ET.fromstring(rss_xml)
-
-        r = requests.get(
-                        url=root.find('./channel/image/url').text,
-                        timeout=10
-                    )
-
-        podcast_config['episodes'] = date_sort(root.findall('./channel/item'))
-        podcast_config['namespaces'] = ns
-        podcast_config['podcast_tags'] = {
-            'album': root.findtext('./channel/title'),
-            'art': r.content,
-            'artMime': r.headers['Content-Type'],
-            'artist': root.findtext(".//itunes:author", namespaces=ns),
-            'album_artist': root.findtext('./channel/title'),
-            'copyright': root.findtext('./channel/copyright'),
-        }
-
-        ext = mimetypes.guess_extension(podcast_config['podcast_tags']['artMime'])
-        out_path = f'{podcast_config["outDir"]}cover{ext}'
-
-        # Save a copy of the album art
-        with open(out_path, 'wb') as f:
-            f.write(podcast_config['podcast_tags']['art'])
-
-        # for episode in root.findall('./channel/item'):
-        for i,episode in enumerate(podcast_config['episodes'], start=1):
-            process_podcast(i, episode, podcast_config)
+    # Podcasts are independent, so several feeds are processed at once
+    workers = max(1, min(8, len(config['podList'])))
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = [
+            pool.submit(process_feed, i, podcast)
+            for i, podcast in enumerate(config['podList'], start=1)
+        ]
+        wait(futures)
+    except BaseException:
+        # Drop any queued feeds, episodes and art (ex. on Ctrl-C) so the
+        # interpreter does not work through them all before exiting
+        for executor in (pool, EPISODE_POOL, ART_POOL):
+            executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    pool.shutdown()
+
+    # Report every failed podcast and exit non-zero if any failed
+    failed = 0
+    for podcast, future in zip(config['podList'], futures):
+        err = future.exception()
+        if err is not None:
+            log(f'[{podcast["name"]}] Podcast failed: {type(err).__name__}: {err}')
+            failed += 1
+
+    if failed:
+        sys.exit(1)
 
 
 if __name__ == '__main__':